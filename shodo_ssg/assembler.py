@@ -26,19 +26,22 @@ def load_settings(root_path: str):
     return settings_loader.data
 
 
-def initialize_components(settings: dict):
+def initialize_components(settings: dict, dev_mode: bool = False):
     """
     Initializes the components necessary for building the static site.
 
     Args:
         settings (dict): The settings data loaded from the settings.json file
+        dev_mode (bool): Whether templates should be checked for changes on every render
 
     Returns:
         Tuple[TemplateHandler, AssetHandler]: A tuple containing the initialized components
     """
     md_loader = MarkdownLoader(settings)
     json_loader = JSONLoader(settings)
-    template_handler = TemplateHandler(settings, md_loader, json_loader)
+    template_handler = TemplateHandler(
+        settings, md_loader, json_loader, dev_mode=dev_mode
+    )
     favicon_writer = FaviconWriter(settings)
     script_writer = ScriptWriter(settings)
     image_writer = ImageWriter(settings)
@@ -62,13 +65,14 @@ def generate_site(template_handler: TemplateHandler, asset_handler: AssetHandler
     site_generator = StaticSiteGenerator(template_handler, asset_handler)
     site_generator.build()
 
-def build_static_site(root_path: str):
+def build_static_site(root_path: str, dev_mode: bool = False):
     """
     Builds a static site by initializing the necessary components and calling the build method.
 
     This function sets up the TemplateHandler with the MarkdownLoader and JSONLoader, as well as
     various writers for favicon, scripts, images, and CSS. It then creates a StaticSiteGenerator
-    instance and calls its build method to generate the static site.
+    instance and calls its build method to generate the static site. Pass `dev_mode=True` for
+    local development to have templates checked for changes on every render.
     """
     # Set up logging configuration
     logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -77,7 +81,7 @@ def build_static_site(root_path: str):
     settings = load_settings(root_path)
 
     # Initialize components
-    template_handler, asset_handler = initialize_components(settings)
+    template_handler, asset_handler = initialize_components(settings, dev_mode)
 
     # Build the static site
     generate_site(template_handler, asset_handler)
@@ -39,7 +39,7 @@ class AssetWriter:
         if os.path.isfile(self.src_path):
             shutil.copyfile(self.src_path, self.destination_path)
         if os.path.isdir(self.src_path):
-            shutil.copytree(self.src_path, self.destination_path)
+            shutil.copytree(self.src_path, self.destination_path, dirs_exist_ok=True)
 
 
 class FaviconWriter(AssetWriter):
@@ -113,12 +113,13 @@ class CSSWriter(AssetWriter):
         """
         self.log_info()
         destination_path = self.destination_path.rstrip("/") + "/"
-        os.makedirs(destination_path)
+        os.makedirs(destination_path, exist_ok=True)
         css_files = []
 
-        for file in os.listdir(self.src_path):
-            if file.endswith(".css"):
-                css_files.append(file)
+        with os.scandir(self.src_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(".css") and entry.is_file():
+                    css_files.append(entry.name)
 
         with open(f"{destination_path}main.css", "w", encoding="utf-8") as outfile:
             for index, css_file in enumerate(css_files):
@@ -4,12 +4,104 @@ from files
 """
 
 import logging
+import multiprocessing
 import os
-from json import load
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from json import dump, load, loads
 from abc import ABC, abstractmethod
-from io import TextIOWrapper
+from functools import cached_property
+from pathlib import Path
 from typing import TypedDict
-from markdown2 import markdown
+from mistune import __version__ as mistune_version, create_markdown
+
+try:
+    from blake3 import blake3 as content_hash
+except ImportError:
+    from hashlib import sha256 as content_hash
+
+_MARKDOWN_PLUGINS = ["strikethrough", "table"]
+
+# Markdown parser and renderer are built once and reused for every file. Raw html
+# is passed through untouched so partials can mix markdown with inline markup.
+_markdown = create_markdown(escape=False, plugins=_MARKDOWN_PLUGINS)
+
+
+def _parse_underscores(_inline, match, state):
+    """
+    Keeps underscores as literal text, so that only asterisks mark emphasis and names
+    like __init__ or _config_ are left as written. The text is flagged with the
+    `_emphasis` key that mistune checks before pairing up emphasis delimiters, which
+    is why mistune 3.3.4 is the minimum supported version.
+    """
+    state.append_token({"type": "text", "raw": match.group(0), "_emphasis": False})
+    return match.end()
+
+
+_markdown.inline.register("underscores", r"_+", _parse_underscores, before="emphasis")
+
+# Mixed into the key of every cached markdown conversion, so that upgrading the parser
+# or changing its plugins invalidates html cached by previous builds
+_MARKDOWN_CACHE_SALT = (
+    f"mistune-{mistune_version}:{','.join(_MARKDOWN_PLUGINS)}:underscores:"
+)
+
+# Directory, relative to the project root, where build caches are persisted between builds
+CACHE_DIR = ".shodo_cache"
+
+# Minimum number of uncached markdown files before conversion is spread across processes
+PARALLEL_CONVERSION_MIN_FILES = 16
+
+# Conversion workers are started without forking the build process, which may already be
+# running asset writes in other threads by the time markdown is converted
+_CONVERSION_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _read_cached_html(cache_path: str):
+    """
+    Returns the cached html at the provided path, or None if nothing has been cached
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8", newline="") as cached_html:
+            return cached_html.read()
+    except FileNotFoundError:
+        return None
+
+
+def _convert_markdown_to_html(markdown_text: str, cache_path: str) -> str:
+    """
+    Converts markdown text to an html string and caches the html at the provided path.
+    Defined at module level so that it can be sent to worker processes.
+    """
+    html = _markdown(markdown_text)
+    # Write to a temporary file first so a cache entry is never partially written
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+    with open(fd, "w", encoding="utf-8", newline="") as temp_file:
+        temp_file.write(html)
+    os.replace(temp_path, cache_path)
+    return html
+
+
+def get_file_stamp(file_path: str) -> list:
+    """
+    Returns the path, modification time and size of a file, used to tell whether it
+    has changed between builds
+    """
+    stat = os.stat(file_path)
+    return [file_path, stat.st_mtime_ns, stat.st_size]
+
+
+def get_nested_dirs(root_dir: str) -> list[str]:
+    """
+    Retrieves a directory and all of its nested children directories in a single
+    walk of the tree. Each directory path in the list ends with a trailing slash.
+    """
+    return [
+        dir_path.rstrip("/") + "/"
+        for dir_path, _, _ in os.walk(root_dir, followlinks=True)
+    ]
 
 
 class SettingsDict(TypedDict):
@@ -34,6 +126,8 @@ class DataLoader(ABC):
     Abstract base class for loading data from files.
     """
 
+    __slots__ = ("src_path",)
+
     def __init__(self, src_path: str):
         """
         Initializes the DataLoader with a specified path to the data, which
@@ -48,10 +142,11 @@ class DataLoader(ABC):
         files = []
         # Append all files if src_path is directory
         if os.path.isdir(self.src_path):
-            for file in os.listdir(self.src_path):
-                files.append(file)
+            with os.scandir(self.src_path) as entries:
+                for entry in entries:
+                    files.append(entry.name)
         # Append single file if src_path is file
-        if os.path.isfile(self.src_path):
+        elif os.path.isfile(self.src_path):
             files.append(self.src_path)
         return files
 
@@ -69,6 +164,10 @@ class MarkdownLoader(DataLoader):
     strings. Extends DataLoader
     """
 
+    __slots__ = ("root_path", "_cache_dir", "file_stamps")
+
+    extension = ".md"
+
     def __init__(self, settings: SettingsDict):
         """
         Extends the DataLoader with the path to the markdown directory pulled from
@@ -76,6 +175,9 @@ class MarkdownLoader(DataLoader):
         """
         super().__init__(settings["markdown_path"])
         self.root_path = settings["root_path"]
+        self._cache_dir = os.path.join(self.root_path, CACHE_DIR, "markdown")
+        # Stamps of the partials read by the last call to `load_args` or `load_all`
+        self.file_stamps: list[list] = []
 
     def list_files(self, sub_dir="partials") -> list[tuple[str]]:
         """
@@ -83,11 +185,13 @@ class MarkdownLoader(DataLoader):
         list of tuple pairs packed with the directory path followed by the file name.
         """
         md_files = []
-        md_dirs = self._get_nested_markdown_dirs(os.path.join(self.src_path, sub_dir))
-        for md_dir_path in md_dirs:
-            for file in os.listdir(md_dir_path):
-                if file.endswith(".md"):
-                    md_files.append((md_dir_path, file))
+        for md_dir_path, _, file_names in os.walk(
+            os.path.join(self.src_path, sub_dir), followlinks=True
+        ):
+            md_dir_path = md_dir_path.rstrip("/") + "/"
+            for file_name in file_names:
+                if file_name.endswith(self.extension):
+                    md_files.append((md_dir_path, file_name))
         return md_files
 
     def _log_info(self):
@@ -96,92 +200,198 @@ class MarkdownLoader(DataLoader):
         """
         logging.info("\033[94mReading markdown files...\033[0m")
 
-    def _convert_to_html(self, markdown_file: TextIOWrapper) -> str:
+    @property
+    def renderer_version(self) -> str:
         """
-        Takes an open markdown file and converts it to an html string
+        Identifies the markdown parser and plugins that markdown is converted with
         """
-        return markdown(
-            markdown_file.read(), extras=["fenced-code-blocks", "code-friendly"]
-        )
+        return _MARKDOWN_CACHE_SALT
 
-    def load_args(self):
+    def _get_cache_path(self, markdown_text: str) -> str:
         """
-        Load html converted from markdown files as a dictionary of render arguments,
-        where the key is the name of the markdown file, and the value is the converted
-        html string to be inserted in the templates.
+        Returns the path to the cached html for the provided markdown content
         """
-        self._log_info()
-        converted_html = {}
-        for md_dir_path, md_file in self.list_files():
-            md_file_path = os.path.join(md_dir_path, md_file)
+        cache_key = content_hash(
+            (_MARKDOWN_CACHE_SALT + markdown_text).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self._cache_dir, f"{cache_key}.html")
+
+    def _convert_files_to_html(self, md_file_paths: list[str]) -> list[str]:
+        """
+        Converts each markdown file to an html string, returned in the same order as
+        the provided paths. Files without cached html are converted in parallel across
+        processes once there are enough of them to outweigh the cost of starting
+        the worker processes.
+        """
+        converted_html = [None] * len(md_file_paths)
+        uncached = []
+        for index, md_file_path in enumerate(md_file_paths):
+            markdown_text = Path(md_file_path).read_text(encoding="utf-8")
+            cache_path = self._get_cache_path(markdown_text)
+            converted_html[index] = _read_cached_html(cache_path)
+            if converted_html[index] is None:
+                uncached.append((index, markdown_text, cache_path))
+
+        if not uncached:
+            return converted_html
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+        indexes, markdown_texts, cache_paths = zip(*uncached)
+        if len(uncached) < PARALLEL_CONVERSION_MIN_FILES:
+            results = list(map(_convert_markdown_to_html, markdown_texts, cache_paths))
+        else:
+            with ProcessPoolExecutor(mp_context=_CONVERSION_MP_CONTEXT) as executor:
+                results = list(
+                    executor.map(
+                        _convert_markdown_to_html,
+                        markdown_texts,
+                        cache_paths,
+                        chunksize=8,
+                    )
+                )
+        for index, html in zip(indexes, results):
+            converted_html[index] = html
+
+        return converted_html
+
+    def _get_render_args(self, md_files: list[tuple[str]], converted_html: list[str]):
+        """
+        Nests the converted html for each partial markdown file under its file name,
+        prefixed by any directories it is nested in
+        """
+        render_args = {}
+        for (md_dir_path, md_file), html in zip(md_files, converted_html):
             md_var_name = os.path.splitext(md_file)[0]
             # Remove everything before "src/theme/markdown/partials/" to get the relative path
             relative_paths = md_dir_path.split("src/theme/markdown/partials/")[-1]
             # Split the relative path into a list of prefixes to append to md variable names
             name_prefixes = [s for s in relative_paths.split("/") if s]
-            # Open and convert markdown file to html
-            with open(md_file_path, "r", encoding="utf-8") as markdown_file:
-                if not name_prefixes:
-                    converted_html[md_var_name] = self._convert_to_html(markdown_file)
-                else:
-                    # Use nested directories as prefixes for the variable name
-                    # ex. "collections/quote.md" -> {"collections": {"quote": "<html>"}}
-                    # which will be exposed in the template as {{ collections.quote }}
-                    keychain = converted_html
-                    for prefix in name_prefixes:
-                        if prefix not in keychain:
-                            keychain[prefix] = {}
-                        keychain = keychain[prefix]
-                        if name_prefixes[-1] == prefix:
-                            if isinstance(keychain, dict):
-                                keychain[md_var_name] = self._convert_to_html(
-                                    markdown_file
-                                )
+            # Use nested directories as prefixes for the variable name
+            # ex. "collections/quote.md" -> {"collections": {"quote": "<html>"}}
+            # which will be exposed in the template as {{ collections.quote }}
+            keychain = render_args
+            for prefix in name_prefixes:
+                if prefix not in keychain:
+                    keychain[prefix] = {}
+                keychain = keychain[prefix]
+            if isinstance(keychain, dict):
+                keychain[md_var_name] = html
 
-        return converted_html
+        return render_args
 
-    def load_pages(self) -> list[dict[str, str]]:
+    def _get_pages(self, md_files: list[tuple[str]]):
         """
-        Load html for markdown articles and prepare data for each to be loaded
-        as a separate page. Returns list of dictionaries with the following
-        key/value pairs:
-            `"html"`: The full converted html string,
-            `"url_segment"`: The path to the markdown file from the markdown/articles directory,
-                            used for matching a layout template to the `.md` file
-            `"name"`: The name of the file, minus the extension
+        Prepares the data for each article markdown file to be written as a page
         """
         markdown_pages = []
-        for md_dir_path, md_file in self.list_files("articles"):
+        for md_dir_path, md_file in md_files:
             page = {}
-            md_file_path = os.path.join(md_dir_path, md_file)
-            with open(md_file_path, "r", encoding="utf-8") as markdown_file:
-                page["html"] = self._convert_to_html(markdown_file)
             page["url_segment"] = md_dir_path.split("src/theme/markdown/articles")[-1]
             page["name"] = os.path.splitext(md_file)[0]
+            page["path"] = os.path.join(md_dir_path, md_file)
             markdown_pages.append(page)
         return markdown_pages
 
-    def _get_nested_markdown_dirs(
-        self, markdown_path="src/theme/markdown/partials", markdown_dirs=None
-    ) -> list[str]:
+    def load_args(self):
+        """
+        Load html converted from markdown files as a dictionary of render arguments,
+        where the key is the name of the markdown file, and the value is the converted
+        html string to be inserted in the templates.
+        """
+        self._log_info()
+        md_files = self.list_files()
+        md_file_paths = [
+            os.path.join(md_dir_path, md_file) for md_dir_path, md_file in md_files
+        ]
+        # Stamped before reading, so that an edit made mid-build is never recorded as read
+        self.file_stamps = [get_file_stamp(path) for path in md_file_paths]
+        return self._get_render_args(
+            md_files, self._convert_files_to_html(md_file_paths)
+        )
+
+    def list_pages(self) -> list[dict[str, str]]:
         """
-        Retrieves all children directories of a parent markdown directory as a list
+        Lists the markdown articles to be loaded as separate pages, without reading or
+        converting them. Returns the same dictionaries as `load_pages`, minus the
+        `"html"` key.
         """
-        markdown_path = markdown_path.rstrip("/") + "/"
+        return self._get_pages(self.list_files("articles"))
 
-        if markdown_dirs is None:
-            markdown_dirs = []
+    def convert_pages(self, pages: list[dict[str, str]]) -> list[dict[str, str]]:
+        """
+        Returns a copy of each listed page with its markdown converted to html under
+        the `"html"` key
+        """
+        converted_html = self._convert_files_to_html([page["path"] for page in pages])
+        return [{**page, "html": html} for page, html in zip(pages, converted_html)]
 
-        markdown_dirs.append(markdown_path)
-        for path in os.listdir(markdown_path):
-            path_from_root = os.path.join(self.root_path, markdown_path + path)
-            # For each directory, recursively append all a nested directories
-            if os.path.isdir(path_from_root):
-                markdown_dirs = self._get_nested_markdown_dirs(
-                    markdown_path + path, markdown_dirs
-                )
-        # When no subdirectories remain, return list of markdown directories
-        return markdown_dirs
+    def load_pages(self) -> list[dict[str, str]]:
+        """
+        Load html for markdown articles and prepare data for each to be loaded
+        as a separate page. Returns list of dictionaries with the following
+        key/value pairs:
+            `"html"`: The full converted html string,
+            `"url_segment"`: The path to the markdown file from the markdown/articles directory,
+                            used for matching a layout template to the `.md` file
+            `"name"`: The name of the file, minus the extension
+            `"path"`: The path to the markdown file
+        """
+        return self.convert_pages(self.list_pages())
+
+    def load_all(self) -> tuple[dict, list[dict[str, str]]]:
+        """
+        Loads the render arguments from the `partials` directory and lists the pages
+        from the `articles` directory, equivalent to calling `load_args` and
+        `list_pages`, but with a single walk of the markdown directory. Article pages
+        are left unconverted, so that only the pages that need to be written again
+        have to be converted. Cached html that no longer belongs to any markdown file
+        is removed.
+        """
+        self._log_info()
+        partials_dir = os.path.join(self.src_path, "partials", "")
+        articles_dir = os.path.join(self.src_path, "articles", "")
+        partial_files = []
+        article_files = []
+        for md_dir_path, md_file in self.list_files(sub_dir=""):
+            if md_dir_path.startswith(partials_dir):
+                partial_files.append((md_dir_path, md_file))
+            elif md_dir_path.startswith(articles_dir):
+                article_files.append((md_dir_path, md_file))
+
+        md_file_paths = [
+            os.path.join(md_dir_path, md_file) for md_dir_path, md_file in partial_files
+        ]
+        self.file_stamps = [get_file_stamp(path) for path in md_file_paths]
+        render_args = self._get_render_args(
+            partial_files, self._convert_files_to_html(md_file_paths)
+        )
+        pages = self._get_pages(article_files)
+        self._prune_cache(md_file_paths + [page["path"] for page in pages])
+        return render_args, pages
+
+    def _prune_cache(self, md_file_paths: list[str]):
+        """
+        Removes any cached html that doesn't belong to one of the provided markdown files
+        as they are now, so that the cache doesn't keep growing as markdown is edited
+        """
+        cache_paths = {
+            self._get_cache_path(Path(md_file_path).read_text(encoding="utf-8"))
+            for md_file_path in md_file_paths
+        }
+        try:
+            with os.scandir(self._cache_dir) as entries:
+                stale_cache_paths = [
+                    entry.path
+                    for entry in entries
+                    if entry.name.endswith(".html") and entry.path not in cache_paths
+                ]
+        except FileNotFoundError:
+            return
+        for cache_path in stale_cache_paths:
+            try:
+                os.remove(cache_path)
+            except FileNotFoundError:
+                pass
 
 
 class JSONLoader(DataLoader):
@@ -190,6 +400,10 @@ class JSONLoader(DataLoader):
     templates as dictionary render arguments
     """
 
+    __slots__ = ("root_path", "file_stamps")
+
+    extension = ".json"
+
     def __init__(self, settings: SettingsDict):
         """
         Extends the DataLoader with the path to the JSON config file pulled from
@@ -197,6 +411,8 @@ class JSONLoader(DataLoader):
         """
         super().__init__(settings["json_config_path"])
         self.root_path = settings["root_path"]
+        # Stamps of the JSON files read by the last call to `load_args`
+        self.file_stamps: list[list] = []
 
     def list_files(self, sub_dir="") -> list[tuple[str]]:
         """
@@ -206,9 +422,10 @@ class JSONLoader(DataLoader):
         json_files = []
         json_dirs = self._get_nested_json_dirs(os.path.join(self.src_path, sub_dir))
         for json_dir_path in json_dirs:
-            for file in os.listdir(json_dir_path):
-                if file.endswith(".json"):
-                    json_files.append((json_dir_path, file))
+            with os.scandir(json_dir_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(self.extension) and entry.is_file():
+                        json_files.append((json_dir_path, entry.name))
         return json_files
 
     def _log_info(self):
@@ -224,33 +441,23 @@ class JSONLoader(DataLoader):
         """
         self._log_info()
         loaded_args = {}
+        file_stamps = []
         for json_dir_path, json_file in self.list_files():
             json_file_path = os.path.join(json_dir_path, json_file)
-            with open(json_file_path, "r", encoding="utf-8") as json_file:
-                converted_json: dict = load(json_file)
-                loaded_args.update(converted_json)
+            file_stamps.append(get_file_stamp(json_file_path))
+            # Hand the raw bytes to the parser rather than decoding them first
+            converted_json: dict = loads(Path(json_file_path).read_bytes())
+            loaded_args.update(converted_json)
+        self.file_stamps = file_stamps
 
         return loaded_args
 
-    def _get_nested_json_dirs(
-        self, json_path="src/theme/json", json_dirs=None
-    ) -> list[str]:
+    def _get_nested_json_dirs(self, json_path="src/theme/json") -> list[str]:
         """
-        Retrieves all children directories of a parent JSON directory as a list
+        Retrieves a parent JSON directory and all of its children directories
+        as a list
         """
-        json_path = json_path.rstrip("/") + "/"
-
-        if json_dirs is None:
-            json_dirs = []
-
-        json_dirs.append(json_path)
-        for path in os.listdir(json_path):
-            path_from_root = os.path.join(self.root_path, json_path + path)
-            # For each directory, recursively append all a nested directories
-            if os.path.isdir(path_from_root):
-                json_dirs = self._get_nested_json_dirs(json_path + path, json_dirs)
-        # When no subdirectories remain, return list of JSON directories
-        return json_dirs
+        return get_nested_dirs(json_path)
 
 
 class SettingsLoader(DataLoader):
@@ -259,30 +466,29 @@ class SettingsLoader(DataLoader):
     destination build directory
     """
 
+    # The cached `data` property is stored in the instance `__dict__`
+    __slots__ = ("root_path", "__dict__")
+
     def __init__(self, root_path: str):
         """
         Extends the JSONLoader with the absolute path to the build settings
         as an argument.
         """
         super().__init__(src_path=os.path.join(root_path, "build_settings.json"))
-        self._data = None
         self.root_path = root_path
 
-    @property
-    def data(self):
+    @cached_property
+    def data(self) -> SettingsDict:
         """
         The loaded arguments from the build settings json config file
         """
-        if self._data is None:
-            self._data = self.load_args()
-            self._data["template_paths"] = self.get_all_template_paths(
-                self._data["root_template_paths"]
-            )
-            self._data["root_path"] = self.root_path
-            self._data["build_dir"] = self._format_build_dir()
-
-        args: SettingsDict = self._data
-        return args
+        settings = self.load_args()
+        settings["template_paths"] = self.get_all_template_paths(
+            settings["root_template_paths"]
+        )
+        settings["root_path"] = self.root_path
+        settings["build_dir"] = self._format_build_dir(settings["build_dir"])
+        return settings
 
     def load_args(self):
         """
@@ -303,12 +509,11 @@ class SettingsLoader(DataLoader):
         """
         logging.info("\033[94mLoading settings and configuration...\033[0m")
 
-    def _format_build_dir(self):
+    def _format_build_dir(self, build_dir):
         """
         Returns the build directory from the build_settings.json with
         any trailing slashes removed
         """
-        build_dir = self._data["build_dir"]
         if isinstance(build_dir, str):
             build_dir = os.path.abspath(build_dir.rstrip("/"))
         else:
@@ -316,34 +521,75 @@ class SettingsLoader(DataLoader):
 
         return build_dir
 
-    def get_nested_template_dirs(
-        self, template_path="src/theme/views/", template_dirs=None
-    ):
+    def get_nested_template_dirs(self, template_path="src/theme/views/"):
         """
-        Retrieves all children directories of a parent template directory as a list
+        Retrieves a parent template directory and all of its children directories
+        as a list
         """
-        template_path = template_path.rstrip("/") + "/"
-
-        if template_dirs is None:
-            template_dirs = []
-
-        template_dirs.append(template_path)
-        for path in os.listdir(template_path):
-            path_from_root = os.path.join(self.root_path, template_path + path)
-            # For each directory, recursively append all a nested directories
-            if os.path.isdir(path_from_root):
-                template_dirs = self.get_nested_template_dirs(
-                    template_path + path, template_dirs
-                )
-        # When no subdirectories remain, return list of template directories
-        return template_dirs
+        return get_nested_dirs(template_path)
 
     def get_all_template_paths(self, root_template_paths: list[str]):
         """
-        Retrieves a list of all nested template paths for each defined root template path
+        Retrieves a list of all nested template paths for each defined root template path.
+        The paths found are cached between builds, and only searched for again once the
+        template directory tree has changed.
         """
+        template_paths = self._load_cached_template_paths(root_template_paths)
+        if template_paths is not None:
+            return template_paths
+
         template_paths = []
         for path in root_template_paths:
             template_paths.extend(self.get_nested_template_dirs(path))
 
+        self._save_cached_template_paths(root_template_paths, template_paths)
         return template_paths
+
+    @property
+    def _template_paths_cache_path(self):
+        """
+        The path to the file caching the template paths found by the last build
+        """
+        return os.path.join(self.root_path, CACHE_DIR, "template_paths.json")
+
+    def _load_cached_template_paths(self, root_template_paths: list[str]):
+        """
+        Returns the template paths cached by a previous build, or None if there is no
+        cache or it is out of date. Adding or removing a directory changes the modification
+        time of its parent, so checking each cached directory is enough to tell whether
+        the tree has changed, without listing the contents of every directory again.
+        """
+        try:
+            with open(
+                self._template_paths_cache_path, "r", encoding="utf-8"
+            ) as cache_file:
+                cache = load(cache_file)
+            # Relative template paths depend on the directory the build is run from
+            if cache["cwd"] != os.getcwd():
+                return None
+            if cache["root_template_paths"] != root_template_paths:
+                return None
+            for path, mtime in cache["template_paths"]:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        return [path for path, _ in cache["template_paths"]]
+
+    def _save_cached_template_paths(
+        self, root_template_paths: list[str], template_paths: list[str]
+    ):
+        """
+        Caches the template paths along with the modification time of each directory
+        """
+        cache = {
+            "cwd": os.getcwd(),
+            "root_template_paths": root_template_paths,
+            "template_paths": [
+                [path, os.stat(path).st_mtime_ns] for path in template_paths
+            ],
+        }
+        os.makedirs(os.path.dirname(self._template_paths_cache_path), exist_ok=True)
+        with open(self._template_paths_cache_path, "w", encoding="utf-8") as cache_file:
+            dump(cache, cache_file)
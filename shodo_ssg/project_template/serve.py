@@ -10,5 +10,5 @@ from shodo_ssg import build_static_site, start_server
 if __name__ == "__main__":
     # Set the ROOT_PATH variable to the directory of this file
     root_path = os.path.dirname(os.path.abspath(__file__))
-    build_static_site(root_path)
+    build_static_site(root_path, dev_mode=True)
     start_server(root_path)
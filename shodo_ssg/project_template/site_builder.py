@@ -3,10 +3,19 @@ This module builds a static site in the destination directory from jinja2
 templates and all static assets
 """
 
+import argparse
 import os
 from shodo_ssg import build_static_site
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument(
+        "--dev",
+        action="store_true",
+        help="Check templates for changes on every render during local development.",
+    )
+    args = parser.parse_args()
+
     # Set the ROOT_PATH variable to the directory of this file
     root_path = os.path.dirname(os.path.abspath(__file__))
-    build_static_site(root_path)
+    build_static_site(root_path, dev_mode=args.dev)
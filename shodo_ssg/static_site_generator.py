@@ -3,9 +3,13 @@ This module combines all needed components to render templates and static assets
 the destination directory
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import glob
 import logging
 import os
 import shutil
+import threading
+import uuid
 
 from .template_handler import TemplateHandler
 from .asset_writer import AssetHandler
@@ -33,6 +37,8 @@ class StaticSiteGenerator:
         self.asset_handler = asset_handler
         self.build_dir = template_handler.build_dir
         self.root_path = template_handler.root_path
+        # Background removals of previous build directories, keyed by directory path
+        self._build_dir_cleanups: dict[str, threading.Thread] = {}
 
     def get_build_dir_path(self):
         """
@@ -46,20 +52,90 @@ class StaticSiteGenerator:
 
     def clear_build_dir(self):
         """
-        Removes the current build directory
+        Removes the current build directory. The directory is moved out of the way at
+        once and its contents are deleted in the background.
+        """
+        self._move_aside_build_dir()
+
+    def _remove_stale_build_dir(self, stale_build_dir_path: str):
+        """
+        Removes a previous build directory in a background thread
+        """
+        cleanup = threading.Thread(
+            target=shutil.rmtree,
+            args=(stale_build_dir_path,),
+            kwargs={"ignore_errors": True},
+            daemon=False,
+        )
+        cleanup.start()
+        self._build_dir_cleanups[stale_build_dir_path] = cleanup
+
+    def _move_aside_build_dir(self):
+        """
+        Moves the current build directory, if any, out of the way and removes it in a
+        background thread so that the build doesn't have to wait on deleting every file
+        from the last one.
         """
         build_dir_path = self.get_build_dir_path()
-        if os.path.exists(build_dir_path):
-            # If build directory exists, clear it
-            shutil.rmtree(build_dir_path)
+        stale_build_dir_path = f"{build_dir_path}.old.{uuid.uuid4().hex}"
+        try:
+            os.rename(build_dir_path, stale_build_dir_path)
+        except FileNotFoundError:
+            return
+        self._remove_stale_build_dir(stale_build_dir_path)
+
+    def _sweep_stale_build_dirs(self):
+        """
+        Removes any previous build directories left behind by a removal that was
+        interrupted before it could finish
+        """
+        self._build_dir_cleanups = {
+            path: cleanup
+            for path, cleanup in self._build_dir_cleanups.items()
+            if cleanup.is_alive()
+        }
+        stale_pattern = f"{glob.escape(self.get_build_dir_path())}.old.*"
+        for stale_build_dir_path in glob.glob(stale_pattern):
+            if stale_build_dir_path not in self._build_dir_cleanups:
+                self._remove_stale_build_dir(stale_build_dir_path)
 
     def refresh_and_create_new_build_dir(self):
         """
-        Clears build directory if exists and creates a new one
+        Clears build directory if exists and creates a new one. The previous build
+        directory is moved aside and removed in a background thread.
         """
-        build_dir_path = self.get_build_dir_path()
         self.clear_build_dir()
-        os.makedirs(build_dir_path)
+        os.makedirs(self.get_build_dir_path())
+
+    def wait_for_build_dir_cleanup(self):
+        """
+        Blocks until any previous build directories are finished being removed
+        """
+        while self._build_dir_cleanups:
+            self._build_dir_cleanups.popitem()[1].join()
+
+    @property
+    def asset_writers(self):
+        """
+        The writers for each static asset included in the build
+        """
+        return (
+            self.asset_handler.favicon,
+            self.asset_handler.scripts,
+            self.asset_handler.images,
+            self.asset_handler.styles,
+        )
+
+    def _set_output_dir(self, output_dir: str):
+        """
+        Points the template handler and every asset writer at a different output directory
+        """
+        current_dir = self.template_handler.build_dir
+        self.template_handler.build_dir = output_dir
+        for writer in self.asset_writers:
+            writer.destination_path = (
+                output_dir + writer.destination_path[len(current_dir) :]
+            )
 
     def build(self):
         """
@@ -69,16 +145,42 @@ class StaticSiteGenerator:
         This method performs the following steps:
         1. Reads markdown files and converts them to HTML.
         2. Loads JSON configuration and data.
-        3. Clears the destination directory and creates a new one.
-        4. Writes the favicon, index.html, and linked HTML pages.
-        5. Copies scripts, assets, and combines all stylesheets into one file.
-        """
-        # Clear destination directory if exists and create new empty directory
-        self.refresh_and_create_new_build_dir()
-
-        self.template_handler.write()
-        self.asset_handler.favicon.write()
-        self.asset_handler.scripts.write()
-        self.asset_handler.images.write()
-        self.asset_handler.styles.write()
+        3. Creates a new staging directory next to the build directory.
+        4. Writes index.html, linked HTML pages, and article pages to the staging directory.
+        5. Concurrently copies the favicon, scripts, and images, and combines all
+           stylesheets into one file in the staging directory.
+        6. Swaps the staging directory in for the previous build directory, which is
+           removed in the background.
+
+        The previous build stays in place and complete until the new one is swapped in.
+        """
+        build_dir_path = self.get_build_dir_path()
+        staging_dir_path = f"{build_dir_path}.new"
+        # Clear out anything left behind by an interrupted build
+        shutil.rmtree(staging_dir_path, ignore_errors=True)
+        self._sweep_stale_build_dirs()
+        os.makedirs(staging_dir_path)
+
+        self._set_output_dir(staging_dir_path)
+        try:
+            # Copy static assets in the background while templates are rendered
+            asset_writers = self.asset_writers
+            with ThreadPoolExecutor(max_workers=len(asset_writers)) as executor:
+                asset_writes = [
+                    executor.submit(writer.write) for writer in asset_writers
+                ]
+                build_manifest = self.template_handler.write(
+                    previous_build_dir=build_dir_path
+                )
+                for asset_write in asset_writes:
+                    asset_write.result()
+        finally:
+            self._set_output_dir(self.build_dir)
+
+        # Swap in the new build, leaving the old one to be removed in the background
+        self._move_aside_build_dir()
+        os.rename(staging_dir_path, build_dir_path)
+        # Only record the inputs of the build once it is in place, so that a failed build
+        # never leaves pages from an older build to be reused
+        self.template_handler.save_build_manifest(build_manifest)
         logging.info("\033[92mSite build successfully completed!\033[0m")
@@ -3,14 +3,94 @@ This module is responsible for handling the template environment as well as
 rendering the Jinja2 templates as html
 """
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+import glob
+import hashlib
+from importlib.metadata import PackageNotFoundError, version
+import json
+from itertools import repeat
 import logging
 import os
+import shutil
+from typing import Optional
+import uuid
 from jinja2 import (
     Environment,
+    FileSystemBytecodeCache,
     FileSystemLoader,
+    Template,
 )
 
-from shodo_ssg.data_loader import JSONLoader, MarkdownLoader, SettingsDict
+from shodo_ssg.data_loader import (
+    CACHE_DIR,
+    JSONLoader,
+    MarkdownLoader,
+    SettingsDict,
+    get_file_stamp,
+)
+
+# File extensions recognized as Jinja templates for linked pages
+TEMPLATE_EXTENSIONS = (".jinja", ".j2", ".jinja2")
+
+try:
+    SHODO_SSG_VERSION = version("shodo_ssg")
+except PackageNotFoundError:
+    # Running from a source checkout
+    SHODO_SSG_VERSION = "unknown"
+
+# The modules of this package, whose changes can change how every page is rendered
+_PACKAGE_MODULES_PATTERN = os.path.join(
+    glob.escape(os.path.dirname(os.path.abspath(__file__))), "*.py"
+)
+
+
+class PrebuiltFileSystemLoader(FileSystemLoader):
+    """
+    A FileSystemLoader that indexes every template under its search paths once, so that
+    loading a template is a single lookup rather than checking for the template in
+    each search path in turn.
+    """
+
+    def __init__(self, searchpath, encoding="utf-8", followlinks=False):
+        """
+        Walks each search path in order, mapping every template name to the first file
+        found for it, matching the precedence of the search paths.
+        """
+        super().__init__(searchpath, encoding=encoding, followlinks=followlinks)
+        self._template_files: dict[str, str] = {}
+        for path in self.searchpath:
+            for dir_path, _, file_names in os.walk(path, followlinks=followlinks):
+                for file_name in file_names:
+                    file_path = os.path.join(dir_path, file_name)
+                    template_name = os.path.relpath(file_path, path)
+                    self._template_files.setdefault(
+                        template_name.replace(os.path.sep, "/"), file_path
+                    )
+
+    def get_source(self, environment, template):
+        """
+        Loads the source of a template from the index, falling back to searching the
+        file system for templates that were added or removed after it was built
+        """
+        file_path = self._template_files.get(template)
+        if file_path is None:
+            return super().get_source(environment, template)
+        try:
+            with open(file_path, "r", encoding=self.encoding) as template_file:
+                contents = template_file.read()
+            mtime = os.path.getmtime(file_path)
+        except FileNotFoundError:
+            return super().get_source(environment, template)
+
+        def uptodate() -> bool:
+            try:
+                return os.path.getmtime(file_path) == mtime
+            except OSError:
+                return False
+
+        return contents, os.path.normpath(file_path), uptodate
 
 
 class TemplateHandler:
@@ -23,12 +103,23 @@ class TemplateHandler:
         settings: SettingsDict,
         markdown_loader: MarkdownLoader,
         json_loader: JSONLoader,
+        dev_mode: bool = False,
     ):
         """
         Initialize the TemplateHandler with the paths to the template directories.
+
+        Compiled templates are persisted to a bytecode cache in the project root so
+        that subsequent builds can skip parsing and compiling unchanged templates.
+        Templates are only checked for changes on every render when `dev_mode` is
+        enabled.
         """
+        bytecode_cache_dir = os.path.join(settings["root_path"], CACHE_DIR, "jinja")
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
         self.template_env = Environment(
-            loader=FileSystemLoader(searchpath=settings["template_paths"])
+            loader=PrebuiltFileSystemLoader(searchpath=settings["template_paths"]),
+            auto_reload=dev_mode,
+            cache_size=400,
+            bytecode_cache=FileSystemBytecodeCache(directory=bytecode_cache_dir),
         )
         self.build_dir = settings["build_dir"]
         self.root_path = settings["root_path"]
@@ -36,6 +127,16 @@ class TemplateHandler:
         self.json_loader = json_loader
         self._render_args = None
         self._md_pages = None
+        self._listed_md_pages = None
+        self._md_layout_templates: dict[str, str] = {}
+
+    def _load_markdown(self):
+        """
+        Loads the render arguments and lists the markdown pages together, so that the
+        markdown directory is only walked once when neither has been loaded yet
+        """
+        self._render_args, self._listed_md_pages = self.markdown_loader.load_all()
+        self._render_args.update(self.json_loader.load_args())
 
     @property
     def render_args(self):
@@ -43,9 +144,11 @@ class TemplateHandler:
         Getter for the render arguments
         """
         if self._render_args is None:
-            # Set the render arguments upon class instantiation
-            self._render_args = self.markdown_loader.load_args()
-            self._render_args.update(self.json_loader.load_args())
+            if self._listed_md_pages is None:
+                self._load_markdown()
+            else:
+                self._render_args = self.markdown_loader.load_args()
+                self._render_args.update(self.json_loader.load_args())
 
         return self._render_args.copy()
 
@@ -55,11 +158,24 @@ class TemplateHandler:
         Getter for the markdown pages
         """
         if self._md_pages is None:
-            # Set the markdown pages upon class instantiation
-            self._md_pages = self.markdown_loader.load_pages()
+            self._md_pages = self.markdown_loader.convert_pages(
+                self._get_listed_md_pages()
+            )
 
         return self._md_pages.copy()
 
+    def _get_listed_md_pages(self):
+        """
+        Returns the markdown pages without their markdown converted to html
+        """
+        if self._listed_md_pages is None:
+            if self._render_args is None:
+                self._load_markdown()
+            else:
+                self._listed_md_pages = self.markdown_loader.list_pages()
+
+        return self._listed_md_pages.copy()
+
     def update_render_arg(self, key, value):
         """
         Update a render argument with the provided key-value pair. Used for
@@ -119,19 +235,46 @@ class TemplateHandler:
         </html>
         """.strip()
 
-    def _write_html_from_template(self, template_name, destination_dir):
+    def _get_doc_shell(self):
+        """
+        Returns the document head and tail that wrap every rendered page
+        """
+        return (self._get_doc_head(), "\n" + self._get_doc_tail())
+
+    def _stream_template_to_file(
+        self,
+        template: Template,
+        destination: str,
+        render_args: dict,
+        doc_shell: tuple[str, str],
+    ):
+        """
+        Renders an already loaded template between the document head and tail,
+        writing the output to the destination file
+        """
+        doc_head, doc_tail = doc_shell
+        with open(destination, "w", encoding="utf-8") as output_file:
+            output_file.write(doc_head)
+            # Stream the rendered template to the file rather than building the full page
+            template.stream(render_args).dump(output_file)
+            output_file.write(doc_tail)
+
+    def _write_html_from_template(
+        self, template_name, destination_dir, render_args=None
+    ):
         """
         Render a template with the provided arguments and write the output to a file.
+        If no render arguments are provided, the shared render arguments are used.
         """
         self._log_info(template_name, destination_dir)
-        template = self.get_template(template_name)
-        with open(destination_dir, "w", encoding="utf-8") as output_file:
-            output_file.write(
-                self._get_doc_head()
-                + template.render(self.render_args)
-                + "\n"
-                + self._get_doc_tail()
-            )
+        if render_args is None:
+            render_args = self.render_args
+        self._stream_template_to_file(
+            self.get_template(template_name),
+            destination_dir,
+            render_args,
+            self._get_doc_shell(),
+        )
 
     def write_home_template(self):
         """
@@ -141,49 +284,121 @@ class TemplateHandler:
             "home.jinja", f"{self.build_dir}/index.html"
         )
 
-    def write_linked_template_pages(self, nested_dirs=""):
+    def _write_page(
+        self,
+        page: tuple[str, str, dict],
+        templates: dict[str, Template],
+        doc_shell: tuple[str, str],
+    ):
         """
-        Write HTML pages linked from the index page using the provided render arguments.
+        Creates the destination directory for a page and writes the rendered
+        template to it. The page is a tuple of the template name, the destination
+        file path, and the render arguments for the template.
+        """
+        template_name, destination, render_args = page
+        self._log_info(template_name, destination)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        self._stream_template_to_file(
+            templates[template_name], destination, render_args, doc_shell
+        )
+
+    def _write_pages(self, pages: list[tuple[str, str, dict]]):
+        """
+        Writes each page concurrently in a thread pool, sharing the template environment
+        """
+        # The head and tail are the same for every page, so only build them once
+        doc_shell = self._get_doc_shell()
+        # Look up each distinct template once, rather than once for every page using it
+        templates = {
+            template_name: self.get_template(template_name)
+            for template_name in {page[0] for page in pages}
+        }
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Consume the results so that any errors raised while writing are re-raised
+            list(
+                executor.map(
+                    self._write_page, pages, repeat(templates), repeat(doc_shell)
+                )
+            )
+
+    def _get_linked_template_pages(self, render_args, nested_dirs=""):
+        """
+        Collects the pages to write for each template in the pages directory, including
+        templates in nested directories. Each directory is scanned exactly once.
         """
+        pages = []
+        # Normalize the prefixes once, so that paths can be built by concatenation
         src_path = os.path.join(self.root_path, "src/theme/views/pages/")
-        pages_src_dir = "/" + os.path.join(src_path, nested_dirs).strip("/") + "/"
-        if os.path.exists(pages_src_dir) and os.listdir(pages_src_dir):
-            for path in os.listdir(pages_src_dir):
-                if (
-                    path.endswith(".jinja")
-                    or path.endswith(".j2")
-                    or path.endswith(".jinja2")
-                ):
-                    template_name = os.path.join(nested_dirs, path)
-                    page_name = nested_dirs + os.path.splitext(path)[0]
-                    if not os.path.exists(f"{self.build_dir}/{page_name}"):
-                        os.makedirs(f"{self.build_dir}/{page_name}")
-                    self._write_html_from_template(
-                        template_name, f"{self.build_dir}/{page_name}/index.html"
-                    )
-                path_from_root = os.path.join(self.root_path, pages_src_dir + path)
-                # If directory, recursively create a nested route
-                if os.path.isdir(path_from_root):
-                    nested_path = nested_dirs + path + "/"
-                    self.write_linked_template_pages(nested_path)
+        build_path = f"{self.build_dir}/"
+        nested_dirs = nested_dirs.strip("/")
+        pending_dirs = deque([f"{nested_dirs}/" if nested_dirs else ""])
+        while pending_dirs:
+            current_dirs = pending_dirs.popleft()
+            pages_src_dir = f"{src_path}{current_dirs}"
+            if not os.path.isdir(pages_src_dir):
+                continue
+            with os.scandir(pages_src_dir) as entries:
+                for entry in entries:
+                    path = entry.name
+                    # If directory, queue it up to be scanned as a nested route
+                    if entry.is_dir():
+                        pending_dirs.append(f"{current_dirs}{path}/")
+                    elif path.endswith(TEMPLATE_EXTENSIONS):
+                        page_name = current_dirs + os.path.splitext(path)[0]
+                        pages.append(
+                            (
+                                f"{current_dirs}{path}",
+                                f"{build_path}{page_name}/index.html",
+                                render_args,
+                            )
+                        )
+        return pages
 
-    def write_article_pages(self):
+    def _get_article_destination(self, md_page: dict[str, str]) -> str:
         """
-        Writes html pages for each markdown file in the `articles` directory
+        Returns the path of the html file that a markdown page is written to
+        """
+        url_segment = md_page["url_segment"].strip("/")
+        page_name = md_page["name"].strip("/")
+        if url_segment:
+            return f"{self.build_dir}/{url_segment}/{page_name}/index.html"
+        return f"{self.build_dir}/{page_name}/index.html"
+
+    def _get_article_pages(self, render_args, md_pages=None):
+        """
+        Collects the pages to write for each markdown file in the `articles` directory,
+        or only for the provided converted markdown pages
         """
-        for md_page in self.md_pages:
+        if md_pages is None:
+            md_pages = self.md_pages
+        pages = []
+        for md_page in md_pages:
             # Get the layout for this template
             layout_template = self.get_md_layout_template(md_page["url_segment"])
-            # Get the path
-            build_path = os.path.join(
-                self.build_dir,
-                md_page["url_segment"].strip("/"),
-                md_page["name"].strip("/"),
+            # Give each page its own arguments rather than mutating the shared ones
+            pages.append(
+                (
+                    layout_template,
+                    self._get_article_destination(md_page),
+                    {**render_args, "article": md_page["html"]},
+                )
             )
-            if not os.path.exists(build_path):
-                os.makedirs(build_path)
-            self.update_render_arg("article", md_page["html"])
-            self._write_html_from_template(layout_template, f"{build_path}/index.html")
+        return pages
+
+    def write_linked_template_pages(self, nested_dirs=""):
+        """
+        Write HTML pages linked from the index page using the provided render arguments.
+        """
+        self._write_pages(
+            self._get_linked_template_pages(self.render_args, nested_dirs)
+        )
+
+    def write_article_pages(self):
+        """
+        Writes html pages for each markdown file in the `articles` directory
+        """
+        self._write_pages(self._get_article_pages(self.render_args))
 
     def get_md_layout_template(self, url_segment: str):
         """
@@ -192,20 +407,155 @@ class TemplateHandler:
         with the same name, the layout template closest in the tree will
         be used.
         """
-        if not url_segment:
-            return "articles/layout.jinja"
-        template_path = os.path.join("articles", url_segment.strip("/"), "layout.jinja")
-        src_view_path = "/" + os.path.join(self.root_path, "src/theme/views/").strip("/")
-        if os.path.exists(f"{src_view_path}/{template_path}"):
-            return template_path
-        segments = url_segment.strip("/").split("/")
-        segments.pop()
-        return self.get_md_layout_template("/".join(segments))
+        if url_segment in self._md_layout_templates:
+            return self._md_layout_templates[url_segment]
+
+        layout_template = "articles/layout.jinja"
+        segments = [segment for segment in url_segment.split("/") if segment]
+        # Walk up the tree one directory at a time until a layout is found
+        while segments:
+            template_path = f"articles/{'/'.join(segments)}/layout.jinja"
+            if template_path in self.article_layouts:
+                layout_template = template_path
+                break
+            segments.pop()
+
+        self._md_layout_templates[url_segment] = layout_template
+        return layout_template
+
+    @cached_property
+    def article_layouts(self) -> frozenset[str]:
+        """
+        The template names of every article layout defined in the views directory,
+        found with a single walk of the tree rather than checking each article path
+        """
+        src_view_path = os.path.join(self.root_path, "src/theme/views")
+        layout_pattern = os.path.join(
+            glob.escape(src_view_path), "articles", "**", "layout.jinja"
+        )
+        return frozenset(
+            os.path.relpath(layout_path, src_view_path)
+            for layout_path in glob.iglob(layout_pattern, recursive=True)
+        )
+
+    @property
+    def _build_manifest_path(self):
+        """
+        The path to the manifest recording the inputs of the last build
+        """
+        return os.path.join(self.root_path, CACHE_DIR, "build_manifest.json")
+
+    def _load_build_manifest(self):
+        """
+        Loads and removes the manifest recorded by the last build, so that a manifest is
+        never left describing a build that didn't finish. Returns None if there is none.
+        """
+        try:
+            with open(self._build_manifest_path, "r", encoding="utf-8") as manifest:
+                build_manifest = json.load(manifest)
+            os.remove(self._build_manifest_path)
+        except (OSError, ValueError):
+            return None
+        return build_manifest
+
+    def save_build_manifest(self, build_manifest: dict):
+        """
+        Records the inputs of the current build for the next build to compare against
+        """
+        os.makedirs(os.path.dirname(self._build_manifest_path), exist_ok=True)
+        with open(self._build_manifest_path, "w", encoding="utf-8") as manifest:
+            json.dump(build_manifest, manifest)
 
-    def write(self):
+    def _get_shared_build_inputs(self, render_args: dict):
+        """
+        Returns the size and modification time of every file that all pages depend on,
+        including every template, JSON file, markdown partial, and module of this
+        package, along with the versions of this package and the markdown renderer and
+        a digest of the render arguments the pages are written with
+        """
+        try:
+            render_args_digest = hashlib.sha256(
+                json.dumps(render_args, sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest()
+        except TypeError:
+            # Keys that can't be sorted; never match so that no page is reused
+            render_args_digest = uuid.uuid4().hex
+        inputs = [
+            ["markdown_renderer", self.markdown_loader.renderer_version],
+            ["shodo_ssg", SHODO_SSG_VERSION],
+            ["render_args", render_args_digest],
+        ]
+        for module_path in glob.iglob(_PACKAGE_MODULES_PATTERN):
+            inputs.append(get_file_stamp(module_path))
+        for template_path in self.template_env.loader.searchpath:
+            with os.scandir(template_path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        inputs.append(get_file_stamp(entry.path))
+        # JSON files and markdown partials were stamped as the render args were loaded
+        inputs += self.json_loader.file_stamps
+        inputs += self.markdown_loader.file_stamps
+        return sorted(inputs)
+
+    def _reuse_page(self, previous_build_dir: str, page_path: str):
+        """
+        Links, or copies if linking isn't possible, a page from the previous build into
+        the current build directory. Returns whether the page could be reused.
+        """
+        previous_page = os.path.join(previous_build_dir, page_path)
+        destination = os.path.join(self.build_dir, page_path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        try:
+            os.link(previous_page, destination)
+        except OSError:
+            try:
+                shutil.copy2(previous_page, destination)
+            except OSError:
+                return False
+        return True
+
+    def write(self, previous_build_dir: Optional[str] = None):
         """
         Writes the root index.html and any linked html pages using the provided render arguments.
+        All pages are written concurrently.
+
+        If the directory of the previous build is provided, article pages are reused from it
+        rather than rendered again when neither their markdown file nor any template, JSON
+        file, markdown partial, render argument, or version of this package has changed
+        since that build. Markdown is only converted
+        for the article pages that are rendered.
+
+        Returns the manifest of the inputs the pages were written from, to be saved with
+        `save_build_manifest` once the build is complete.
         """
-        self.write_home_template()
-        self.write_linked_template_pages()
-        self.write_article_pages()
+        render_args = self.render_args
+        shared_inputs = self._get_shared_build_inputs(render_args)
+        build_manifest = self._load_build_manifest()
+        reusable_pages = {}
+        if (
+            previous_build_dir is not None
+            and build_manifest is not None
+            and build_manifest.get("shared_inputs") == shared_inputs
+        ):
+            reusable_pages = build_manifest.get("pages", {})
+
+        home_page = ("home.jinja", f"{self.build_dir}/index.html", render_args)
+        pages = [home_page] + self._get_linked_template_pages(render_args)
+        page_inputs = {}
+        md_pages_to_write = []
+        for md_page in self._get_listed_md_pages():
+            page_path = os.path.relpath(
+                self._get_article_destination(md_page), self.build_dir
+            )
+            page_inputs[page_path] = get_file_stamp(md_page["path"])
+            if reusable_pages.get(page_path) == page_inputs[page_path] and (
+                self._reuse_page(previous_build_dir, page_path)
+            ):
+                continue
+            md_pages_to_write.append(md_page)
+        pages += self._get_article_pages(
+            render_args, self.markdown_loader.convert_pages(md_pages_to_write)
+        )
+        self._write_pages(pages)
+        return {"shared_inputs": shared_inputs, "pages": page_inputs}
+
@@ -2,6 +2,8 @@
 
 import os
 
+from shodo_ssg.template_handler import TEMPLATE_EXTENSIONS
+
 
 def get_linked_page_relative_build_paths(template_paths: list[str]):
     """Returns the expected relative paths to the linked template pages in the build directory"""
@@ -15,11 +17,7 @@ def get_linked_page_relative_build_paths(template_paths: list[str]):
     for path in linked_page_dirs:
         # get the file in the directory
         for file in os.listdir(path):
-            if (
-                file.endswith(".jinja")
-                or file.endswith(".j2")
-                or file.endswith(".jinja2")
-            ):
+            if file.endswith(TEMPLATE_EXTENSIONS):
                 relative_path = (
                     path.split("src/theme/views/pages/")[-1].strip("/")
                     + "/"
@@ -30,55 +28,72 @@ def get_linked_page_relative_build_paths(template_paths: list[str]):
     return linked_page_paths
 
 
-def linked_template_pages_exist_in_build_dir(build_dir_path, template_paths: list[str]):
+def get_build_index(build_dir_path) -> frozenset[str]:
+    """
+    Returns the path of every file and directory in the build directory, relative to it,
+    so that several checks can share a single walk of the build
+    """
+    build_index = set()
+    for dir_path, dir_names, file_names in os.walk(build_dir_path):
+        relative_dir_path = os.path.relpath(dir_path, build_dir_path)
+        for name in dir_names + file_names:
+            build_index.add(os.path.normpath(os.path.join(relative_dir_path, name)))
+    return frozenset(build_index)
+
+
+def linked_template_pages_exist_in_build_dir(
+    build_dir_path, template_paths: list[str], build_index=None
+):
     """Returns True if all linked template pages exist in the build directory"""
-    linked_page_paths = get_linked_page_relative_build_paths(template_paths)
-    for path in linked_page_paths:
-        if not os.path.exists(os.path.join(build_dir_path, path)):
-            return False
-    return True
+    if build_index is None:
+        build_index = get_build_index(build_dir_path)
+    linked_page_paths = set(get_linked_page_relative_build_paths(template_paths))
+    return linked_page_paths <= build_index
 
 
-def markdown_pages_exist_in_build_dir(build_dir_path, md_pages: list[dict]):
+def markdown_pages_exist_in_build_dir(
+    build_dir_path, md_pages: list[dict], build_index=None
+):
     """Returns True if all markdown pages exist in the build directory"""
-    for md_page in md_pages:
-        page_build_path = os.path.join(
-            build_dir_path,
-            md_page["url_segment"].strip("/"),
-            md_page["name"].strip("/"),
-        )
-        if not os.path.exists(page_build_path):
-            return False
-    return True
-
-
-def scripts_exist_in_build_dir(build_dir_path, scripts_path_segment="static/scripts"):
+    if build_index is None:
+        build_index = get_build_index(build_dir_path)
+    md_page_paths = {
+        os.path.join(md_page["url_segment"].strip("/"), md_page["name"].strip("/"))
+        for md_page in md_pages
+    }
+    return md_page_paths <= build_index
+
+
+def asset_exists_in_build_dir(build_dir_path, path_segment, build_index=None):
+    """Returns True if the asset at the path segment exists in the build directory"""
+    if build_index is None:
+        return os.path.exists(os.path.join(build_dir_path, path_segment))
+    return os.path.normpath(path_segment) in build_index
+
+
+def scripts_exist_in_build_dir(
+    build_dir_path, scripts_path_segment="static/scripts", build_index=None
+):
     """Returns True if all scripts exist in the build directory"""
-    scripts_build_path = os.path.join(build_dir_path, scripts_path_segment)
-    if not os.path.exists(scripts_build_path):
-        return False
-    return True
+    return asset_exists_in_build_dir(build_dir_path, scripts_path_segment, build_index)
 
 
-def css_exist_in_build_dir(build_dir_path, styles_path_segment="static/styles"):
+def css_exist_in_build_dir(
+    build_dir_path, styles_path_segment="static/styles", build_index=None
+):
     """Returns True if all css exist in the build directory"""
-    css_build_path = os.path.join(build_dir_path, styles_path_segment)
-    if not os.path.exists(css_build_path):
-        return False
-    return True
+    return asset_exists_in_build_dir(build_dir_path, styles_path_segment, build_index)
 
 
-def images_exist_in_build_dir(build_dir_path, images_path_segment="static/images"):
+def images_exist_in_build_dir(
+    build_dir_path, images_path_segment="static/images", build_index=None
+):
     """Returns True if all images exist in the build directory"""
-    images_build_path = os.path.join(build_dir_path, images_path_segment)
-    if not os.path.exists(images_build_path):
-        return False
-    return True
+    return asset_exists_in_build_dir(build_dir_path, images_path_segment, build_index)
 
 
-def favicon_exists_in_build_dir(build_dir_path, favicon_path_segment="favicon.ico"):
+def favicon_exists_in_build_dir(
+    build_dir_path, favicon_path_segment="favicon.ico", build_index=None
+):
     """Returns True if the favicon exists in the build directory"""
-    favicon_build_path = os.path.join(build_dir_path, favicon_path_segment)
-    if not os.path.exists(favicon_build_path):
-        return False
-    return True
+    return asset_exists_in_build_dir(build_dir_path, favicon_path_segment, build_index)
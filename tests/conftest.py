@@ -3,6 +3,7 @@
 import json
 import os
 import shutil
+import stat
 import pytest
 
 from shodo_ssg.data_loader import (
@@ -21,35 +22,62 @@ from shodo_ssg.asset_writer import (
     AssetHandler,
 )
 
+_READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+
+def _hardlink_or_copy(src, dst, *, follow_symlinks=True):
+    """
+    Hard links a file, falling back to copying it where linking isn't supported
+    """
+    try:
+        os.link(src, dst, follow_symlinks=follow_symlinks)
+    except OSError:
+        shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+
+@pytest.fixture(scope="session")
+def project_template_golden_copy(tmp_path_factory):
+    """
+    Create a single copy of the project_template directory tree for the test session,
+    which each test's project directory is copied from.
+    """
+    golden_path = tmp_path_factory.mktemp("golden") / "project_template"
+    shutil.copytree("shodo_ssg/project_template", golden_path)
+    # Each test's project shares these files through hard links, so they are made
+    # read-only for writing to one in place to fail rather than leak into later tests
+    for dir_path, _, file_names in os.walk(golden_path):
+        for file_name in file_names:
+            os.chmod(os.path.join(dir_path, file_name), _READ_ONLY)
+    return golden_path
+
 
 @pytest.fixture
-def temp_project_path(tmp_path):
+def temp_project_path(
+    tmp_path, project_template_golden_copy
+):  # pylint: disable=redefined-outer-name
     """
     Create a copy of the project_template directory tree in the temporary testing directory
     and return the path.
     """
     temp_path = tmp_path / "project_template"
-    temp_path.mkdir()
-    # Create a copy of the project_template directory
-    src_dir = "shodo_ssg/project_template"
-    dest_dir = os.path.abspath(temp_path)
-    # Copy files and folders
-    shutil.copytree(src_dir, dest_dir, dirs_exist_ok=True)
+    # Hard link files and folders from the copy staged for the session. Tests that need
+    # to change a project file must replace it rather than write to it in place.
+    dest_dir = str(temp_path)
+    shutil.copytree(
+        project_template_golden_copy, dest_dir, copy_function=_hardlink_or_copy
+    )
 
     # Replace the existing settings.json file with test settings that use the tmp_path
     test_settings = create_test_build_settings_from_temp_path(temp_path)
 
     settings_file = os.path.join(dest_dir, "build_settings.json")
-    if os.path.exists(settings_file):
-        os.remove(settings_file)
+    # Unlink the settings file first so that the session copy is left untouched
+    os.unlink(settings_file)
     with open(settings_file, "w", encoding="utf-8") as f:
         f.write(json.dumps(test_settings))
 
-    yield temp_path
-
-    # Remove the project_template directory
-    if os.path.exists(dest_dir):
-        shutil.rmtree(dest_dir)
+    # The directory is removed along with the rest of tmp_path by pytest
+    return temp_path
 
 
 @pytest.fixture
@@ -61,37 +89,59 @@ def settings_dict(temp_project_path):  # pylint: disable=redefined-outer-name
     to the build_settings.json file, but includes all nested template directory paths as well as the
     root_path.
     """
-    temp_abs_path = os.path.abspath(temp_project_path)
+    # tmp_path is always absolute, so paths can be built directly from it
+    temp_abs_path = str(temp_project_path)
+    views_path = f"{temp_abs_path}/src/theme/views"
     return SettingsDict(
         {
             "template_paths": [
-                os.path.join(temp_project_path, "src/theme/views/"),
-                os.path.join(temp_project_path, "src/theme/views/articles/"),
-                os.path.join(temp_project_path, "src/theme/views/articles/blog/"),
-                os.path.join(
-                    temp_project_path, "src/theme/views/articles/blog/subject/"
-                ),
-                os.path.join(temp_project_path, "src/theme/views/articles/newsletter/"),
-                os.path.join(temp_project_path, "src/theme/views/pages/"),
-                os.path.join(temp_project_path, "src/theme/views/pages/nested-route/"),
-                os.path.join(
-                    temp_project_path,
-                    "src/theme/views/pages/nested-route/double-nested-route/",
-                ),
-                os.path.join(temp_project_path, "src/theme/views/partials/"),
+                f"{views_path}/{nested_dir}"
+                for nested_dir in (
+                    "",
+                    "articles/",
+                    "articles/blog/",
+                    "articles/blog/subject/",
+                    "articles/newsletter/",
+                    "pages/",
+                    "pages/nested-route/",
+                    "pages/nested-route/double-nested-route/",
+                    "partials/",
+                )
             ],
             "root_path": temp_abs_path,
-            "build_dir": os.path.join(temp_project_path, "dist"),
-            "markdown_path": os.path.join(temp_project_path, "src/theme/markdown"),
-            "json_config_path": os.path.join(temp_project_path, "src/store"),
-            "favicon_path": os.path.join(temp_project_path, "src/favicon.ico"),
-            "scripts_path": os.path.join(temp_project_path, "src/theme/static/scripts"),
-            "images_path": os.path.join(temp_project_path, "src/theme/static/images"),
-            "styles_path": os.path.join(temp_project_path, "src/theme/static/styles"),
+            "build_dir": f"{temp_abs_path}/dist",
+            "markdown_path": f"{temp_abs_path}/src/theme/markdown",
+            "json_config_path": f"{temp_abs_path}/src/store",
+            "favicon_path": f"{temp_abs_path}/src/favicon.ico",
+            "scripts_path": f"{temp_abs_path}/src/theme/static/scripts",
+            "images_path": f"{temp_abs_path}/src/theme/static/images",
+            "styles_path": f"{temp_abs_path}/src/theme/static/styles",
         }
     )
 
 
+@pytest.fixture
+def build_path(settings_dict):  # pylint: disable=redefined-outer-name
+    """
+    Return the path to the build directory, making sure that nothing has been built
+    there yet. The build directory lives in the test's own tmp_path, so there is never
+    a previous build to clear out.
+    """
+    path = settings_dict["build_dir"]
+    assert not os.path.exists(path)
+    return path
+
+
+@pytest.fixture
+def build_dir(settings_dict):  # pylint: disable=redefined-outer-name
+    """
+    Create the empty build directory that assets are written into and return its path
+    """
+    build_path = settings_dict["build_dir"]
+    os.makedirs(build_path)
+    return build_path
+
+
 @pytest.fixture
 def template_handler_dependencies(
     settings_dict,
@@ -101,7 +151,7 @@ def template_handler_dependencies(
     """
     markdown_loader = MarkdownLoader(settings_dict)
     json_loader = JSONLoader(settings_dict)
-    return SettingsDict(settings_dict), markdown_loader, json_loader
+    return settings_dict, markdown_loader, json_loader
 
 
 @pytest.fixture
@@ -126,12 +176,12 @@ def static_site_generator_deps(
 def create_test_build_settings_from_temp_path(temp_path):
     """Create a dictionary of settings for testing."""
     return {
-        "root_template_paths": [f"{os.path.join(temp_path, 'src/theme/views')}"],
-        "markdown_path": f"{os.path.join(temp_path, 'src/theme/markdown')}",
-        "json_config_path": f"{os.path.join(temp_path, 'src/store')}",
-        "favicon_path": f"{os.path.join(temp_path, 'src/favicon.ico')}",
-        "scripts_path": f"{os.path.join(temp_path, 'src/theme/static/scripts')}",
-        "images_path": f"{os.path.join(temp_path, 'src/theme/static/images')}",
-        "styles_path": f"{os.path.join(temp_path, 'src/theme/static/styles')}",
-        "build_dir": f"{os.path.join(temp_path, 'dist')}",
+        "root_template_paths": [f"{temp_path}/src/theme/views"],
+        "markdown_path": f"{temp_path}/src/theme/markdown",
+        "json_config_path": f"{temp_path}/src/store",
+        "favicon_path": f"{temp_path}/src/favicon.ico",
+        "scripts_path": f"{temp_path}/src/theme/static/scripts",
+        "images_path": f"{temp_path}/src/theme/static/images",
+        "styles_path": f"{temp_path}/src/theme/static/styles",
+        "build_dir": f"{temp_path}/dist",
     }
@@ -1,7 +1,6 @@
 """Tests for the assembler module."""
 
 import os
-import shutil
 from shodo_ssg.assembler import (
     load_settings,
     initialize_components,
@@ -13,6 +12,7 @@ from shodo_ssg.asset_writer import AssetHandler
 from tests.build_validation import (
     css_exist_in_build_dir,
     favicon_exists_in_build_dir,
+    get_build_index,
     images_exist_in_build_dir,
     linked_template_pages_exist_in_build_dir,
     markdown_pages_exist_in_build_dir,
@@ -22,20 +22,17 @@ from tests.build_validation import (
 
 def test_load_settings(temp_project_path, settings_dict):
     """Test the load_settings function."""
-    temp_abs_path = os.path.abspath(temp_project_path)
-    data = load_settings(temp_abs_path)
+    data = load_settings(str(temp_project_path))
 
     assert isinstance(data, dict)
-    assert os.path.abspath(data["build_dir"]) == os.path.abspath(
-        settings_dict["build_dir"]
-    )
+    assert data["build_dir"] == settings_dict["build_dir"]
     assert data["markdown_path"] == settings_dict["markdown_path"]
     assert data["json_config_path"] == settings_dict["json_config_path"]
     assert data["favicon_path"] == settings_dict["favicon_path"]
     assert data["scripts_path"] == settings_dict["scripts_path"]
     assert data["images_path"] == settings_dict["images_path"]
     assert data["styles_path"] == settings_dict["styles_path"]
-    assert set(data["template_paths"]) == set(settings_dict["template_paths"])
+    assert sorted(data["template_paths"]) == sorted(settings_dict["template_paths"])
 
 
 def test_initialize_components(settings_dict, static_site_generator_deps):
@@ -50,9 +47,7 @@ def test_initialize_components(settings_dict, static_site_generator_deps):
     assert components[0].build_dir == template_handler.build_dir
     assert components[0].root_path == template_handler.root_path
     assert len(components[0].md_pages) == len(template_handler.md_pages)
-    assert set(components[0].render_args.keys()) == set(
-        template_handler.render_args.keys()
-    )
+    assert sorted(components[0].render_args) == sorted(template_handler.render_args)
     assert components[0].markdown_loader
     assert components[0].json_loader
     assert components[1].favicon
@@ -61,14 +56,9 @@ def test_initialize_components(settings_dict, static_site_generator_deps):
     assert components[1].styles
 
 
-def test_generate_site(static_site_generator_deps, settings_dict):
+def test_generate_site(static_site_generator_deps, settings_dict, build_path):
     """Test the generate_site function"""
     template_handler, asset_handler = static_site_generator_deps
-    build_path = os.path.abspath(settings_dict["build_dir"])
-
-    if os.path.exists(build_path):
-        shutil.rmtree(build_path)
-    assert not os.path.exists(build_path)
 
     generate_site(template_handler, asset_handler)
 
@@ -76,26 +66,26 @@ def test_generate_site(static_site_generator_deps, settings_dict):
     assert os.listdir(build_path)
     assert os.path.isdir(build_path)
     assert os.path.exists(os.path.join(build_path, "index.html"))
+    build_index = get_build_index(build_path)
     assert linked_template_pages_exist_in_build_dir(
-        build_path, settings_dict["template_paths"]
+        build_path, settings_dict["template_paths"], build_index
     )
-    assert markdown_pages_exist_in_build_dir(build_path, template_handler.md_pages)
-    assert scripts_exist_in_build_dir(build_path)
-    assert css_exist_in_build_dir(build_path)
-    assert images_exist_in_build_dir(build_path)
-    assert favicon_exists_in_build_dir(build_path)
+    assert markdown_pages_exist_in_build_dir(
+        build_path, template_handler.md_pages, build_index
+    )
+    assert scripts_exist_in_build_dir(build_path, build_index=build_index)
+    assert css_exist_in_build_dir(build_path, build_index=build_index)
+    assert images_exist_in_build_dir(build_path, build_index=build_index)
+    assert favicon_exists_in_build_dir(build_path, build_index=build_index)
 
 
-def test_build_static_site(temp_project_path, template_handler_dependencies):
+def test_build_static_site(
+    temp_project_path, template_handler_dependencies, build_path
+):
     """Test the build_static_site function"""
-    tmp_proj_root = os.path.abspath(temp_project_path)
+    tmp_proj_root = str(temp_project_path)
     settings, markdown_loader, json_loader = template_handler_dependencies
     template_handler = TemplateHandler(settings, markdown_loader, json_loader)
-    build_path = os.path.abspath(settings["build_dir"])
-
-    if os.path.exists(build_path):
-        shutil.rmtree(build_path)
-    assert not os.path.exists(build_path)
 
     build_static_site(tmp_proj_root)
 
@@ -103,11 +93,14 @@ def test_build_static_site(temp_project_path, template_handler_dependencies):
     assert os.listdir(build_path)
     assert os.path.isdir(build_path)
     assert os.path.exists(os.path.join(build_path, "index.html"))
+    build_index = get_build_index(build_path)
     assert linked_template_pages_exist_in_build_dir(
-        build_path, settings["template_paths"]
+        build_path, settings["template_paths"], build_index
+    )
+    assert markdown_pages_exist_in_build_dir(
+        build_path, template_handler.md_pages, build_index
     )
-    assert markdown_pages_exist_in_build_dir(build_path, template_handler.md_pages)
-    assert scripts_exist_in_build_dir(build_path)
-    assert css_exist_in_build_dir(build_path)
-    assert images_exist_in_build_dir(build_path)
-    assert favicon_exists_in_build_dir(build_path)
+    assert scripts_exist_in_build_dir(build_path, build_index=build_index)
+    assert css_exist_in_build_dir(build_path, build_index=build_index)
+    assert images_exist_in_build_dir(build_path, build_index=build_index)
+    assert favicon_exists_in_build_dir(build_path, build_index=build_index)
@@ -1,7 +1,6 @@
 """Tests for the asset_writer module."""
 
 import os
-import shutil
 from shodo_ssg.asset_writer import (
     AssetWriter,
     FaviconWriter,
@@ -11,101 +10,80 @@ from shodo_ssg.asset_writer import (
 )
 
 
-def test_base_asset_writer_write(settings_dict):
+def test_base_asset_writer_write(settings_dict, build_dir):
     """Test the write method of the base AssetWriter Class"""
-    dest_path = settings_dict["build_dir"] + "/favicon.ico"
+    dest_path = build_dir + "/favicon.ico"
 
     asset_writer = AssetWriter(settings_dict["favicon_path"], dest_path)
 
-    if not os.path.exists(settings_dict["build_dir"]):
-        # Make the dist directory if it doesn't exist
-        os.makedirs(settings_dict["build_dir"])
-
-    if os.path.exists(dest_path):
-        os.remove(dest_path)
-        assert not os.path.exists(dest_path)
-
     asset_writer.write()
 
-    assert os.path.exists(dest_path)
     assert os.path.isfile(dest_path)
 
 
-def test_favicon_writer_write(settings_dict):
+def test_favicon_writer_write(settings_dict, build_dir):
     """Test the write method of the FaviconWriter class."""
     favicon_writer = FaviconWriter(settings_dict)
 
-    dest_path = settings_dict["build_dir"] + "/favicon.ico"
-
-    if not os.path.exists(settings_dict["build_dir"]):
-        # Make the dist directory if it doesn't exist
-        os.makedirs(settings_dict["build_dir"])
-
-    if os.path.exists(dest_path):
-        os.remove(dest_path)
-        assert not os.path.exists(dest_path)
+    dest_path = build_dir + "/favicon.ico"
 
     favicon_writer.write()
 
-    assert os.path.exists(dest_path)
     assert os.path.isfile(dest_path)
 
 
-def test_script_writer_write(settings_dict):
+def test_script_writer_write(settings_dict, build_dir):
     """Test the write method of the ScriptWriter class."""
     script_writer = ScriptWriter(settings_dict)
 
-    dest_path = settings_dict["build_dir"] + "/static/scripts"
-
-    if not os.path.exists(settings_dict["build_dir"]):
-        # Make the dist directory if it doesn't exist
-        os.makedirs(settings_dict["build_dir"])
-
-    if os.path.exists(dest_path):
-        shutil.rmtree(dest_path)
-        assert not os.path.exists(dest_path)
+    dest_path = build_dir + "/static/scripts"
 
     script_writer.write()
 
-    assert os.path.exists(dest_path)
     assert os.path.isdir(dest_path)
 
 
-def test_css_writer_write(settings_dict):
+def test_css_writer_write(settings_dict, build_dir):
     """Test the write method of the CSS writer class"""
     css_writer = CSSWriter(settings_dict)
 
-    dest_path = settings_dict["build_dir"] + "/static/styles"
-
-    if not os.path.exists(settings_dict["build_dir"]):
-        # Make the dist directory if it doesn't exist
-        os.makedirs(settings_dict["build_dir"])
-
-    if os.path.exists(dest_path):
-        shutil.rmtree(dest_path)
-        assert not os.path.exists(dest_path)
+    dest_path = build_dir + "/static/styles"
 
     css_writer.write()
 
-    assert os.path.exists(dest_path)
     assert os.path.isdir(dest_path)
 
 
-def test_image_writer_write(settings_dict):
+def test_image_writer_write(settings_dict, build_dir):
     """Test the write method of the ImageWriter class"""
     img_writer = ImageWriter(settings_dict)
 
-    dest_path = settings_dict["build_dir"] + "/static/images"
-
-    if not os.path.exists(settings_dict["build_dir"]):
-        # Make the dist directory if it doesn't exist
-        os.makedirs(settings_dict["build_dir"])
-
-    if os.path.exists(dest_path):
-        shutil.rmtree(dest_path)
-        assert not os.path.exists(dest_path)
+    dest_path = build_dir + "/static/images"
 
     img_writer.write()
 
-    assert os.path.exists(dest_path)
     assert os.path.isdir(dest_path)
+
+
+def test_css_writer_write_existing_destination(settings_dict, build_dir):
+    """Test that the CSS writer can write into an existing destination directory"""
+    css_writer = CSSWriter(settings_dict)
+
+    dest_path = build_dir + "/static/styles"
+    os.makedirs(dest_path)
+
+    css_writer.write()
+
+    assert os.path.isfile(dest_path + "/main.css")
+
+
+def test_script_writer_write_existing_destination(settings_dict, build_dir):
+    """Test that the script writer can copy into an existing destination directory"""
+    script_writer = ScriptWriter(settings_dict)
+
+    dest_path = build_dir + "/static/scripts"
+    os.makedirs(dest_path)
+
+    script_writer.write()
+
+    assert os.path.isfile(dest_path + "/main.js")
@@ -2,7 +2,11 @@
 
 import json
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 
+from shodo_ssg import data_loader
 from shodo_ssg.data_loader import (
     MarkdownLoader,
     JSONLoader,
@@ -10,10 +14,10 @@ from shodo_ssg.data_loader import (
 )
 
 
-def test_markdown_loader_list_files(
+def test_markdown_loader(
     settings_dict,
 ):  # pylint: disable=redefined-outer-name
-    """Test the list_files method of the MarkdownLoader class."""
+    """Test listing, loading args and loading pages with the MarkdownLoader class."""
     loader = MarkdownLoader(settings_dict)
     files = loader.list_files()
     assert isinstance(files, list)
@@ -22,29 +26,127 @@ def test_markdown_loader_list_files(
     assert "src/theme/markdown/" in md_path
     assert md_file_name.endswith(".md")
 
+    assert isinstance(loader.load_args(), dict)
+    assert isinstance(loader.load_pages(), list)
 
-def test_markdown_loader_load_args(
+
+def test_markdown_loader_list_files_includes_hidden_files(
+    settings_dict,
+):  # pylint: disable=redefined-outer-name
+    """Test that markdown in hidden files and directories is listed like any other."""
+    partials_path = os.path.join(settings_dict["markdown_path"], "partials")
+    hidden_dir_path = os.path.join(partials_path, ".drafts")
+    os.makedirs(hidden_dir_path)
+    for md_file_path in (
+        os.path.join(partials_path, ".hidden.md"),
+        os.path.join(hidden_dir_path, "draft.md"),
+    ):
+        with open(md_file_path, "w", encoding="utf-8") as md_file:
+            md_file.write("Hidden")
+
+    files = MarkdownLoader(settings_dict).list_files()
+
+    assert (partials_path + "/", ".hidden.md") in files
+    assert (hidden_dir_path + "/", "draft.md") in files
+
+
+def test_markdown_loader_leaves_underscores_as_text(
+    settings_dict,
+):  # pylint: disable=redefined-outer-name
+    """Test that underscores are left as text rather than converted to emphasis."""
+    md_file_path = os.path.join(settings_dict["markdown_path"], "partials/names.md")
+    with open(md_file_path, "w", encoding="utf-8") as md_file:
+        md_file.write("call __init__ here, use _config_ value, *em* and **strong**")
+
+    html = MarkdownLoader(settings_dict).load_args()["names"]
+
+    assert html == (
+        "<p>call __init__ here, use _config_ value, <em>em</em> and "
+        "<strong>strong</strong></p>\n"
+    )
+
+
+def test_markdown_loader_caches_converted_html(
     settings_dict,
 ):  # pylint: disable=redefined-outer-name
-    """Test the load_args method of the MarkdownLoader class."""
+    """Test that converted markdown is cached on disk and reused on later conversions."""
     loader = MarkdownLoader(settings_dict)
-    args = loader.load_args()
-    assert isinstance(args, dict)
+    cache_dir = os.path.join(settings_dict["root_path"], ".shodo_cache/markdown")
+    md_file_path = os.path.join(settings_dict["markdown_path"], "partials/short.md")
 
+    # pylint: disable=protected-access
+    [html] = loader._convert_files_to_html([md_file_path])
+    cached_files = os.listdir(cache_dir)
+    assert len(cached_files) == 1
+    assert cached_files[0].endswith(".html")
 
-def test_markdown_loader_load_pages(
+    # Overwrite the cache entry to confirm that it is used for unchanged markdown
+    with open(os.path.join(cache_dir, cached_files[0]), "w", encoding="utf-8") as f:
+        f.write("<p>cached</p>")
+    assert loader._convert_files_to_html([md_file_path]) == ["<p>cached</p>"]
+    assert loader.load_args()["short"] == "<p>cached</p>"
+    assert html != "<p>cached</p>"
+
+
+def test_markdown_loader_load_all_prunes_unused_cache(
     settings_dict,
 ):  # pylint: disable=redefined-outer-name
-    """Test the load_pages method of the MarkdownLoader class."""
+    """Test that load_all removes cached html that no markdown file uses anymore."""
+    cache_dir = os.path.join(settings_dict["root_path"], ".shodo_cache/markdown")
     loader = MarkdownLoader(settings_dict)
-    pages = loader.load_pages()
-    assert isinstance(pages, list)
+    assert not os.path.exists(cache_dir)
+
+    loader.load_all()
+    loader.load_pages()
+    cached_files = set(os.listdir(cache_dir))
+    assert len(cached_files) == len(loader.list_files()) + len(loader.list_pages())
+
+    md_file_path = os.path.join(settings_dict["markdown_path"], "partials/short.md")
+    with open(md_file_path, "r", encoding="utf-8") as md_file:
+        md_text = md_file.read()
+    # Replace the file rather than writing to the one shared with other tests
+    os.unlink(md_file_path)
+    with open(md_file_path, "w", encoding="utf-8") as md_file:
+        md_file.write(md_text + "\nAn edited paragraph\n")
+    loader.load_all()
+
+    refreshed_files = set(os.listdir(cache_dir))
+    assert len(refreshed_files) == len(cached_files)
+    assert len(refreshed_files - cached_files) == 1
+
+
+def test_markdown_loader_load_pages_converts_in_parallel(
+    settings_dict, monkeypatch
+):  # pylint: disable=redefined-outer-name
+    """Test that load_pages converts markdown across worker processes for many files."""
+    serial_pages = MarkdownLoader(settings_dict).load_pages()
+    shutil.rmtree(os.path.join(settings_dict["root_path"], ".shodo_cache/markdown"))
+    monkeypatch.setattr(data_loader, "PARALLEL_CONVERSION_MIN_FILES", 1)
+    pool_contexts = []
 
+    class RecordingProcessPoolExecutor(ProcessPoolExecutor):
+        """Records the multiprocessing context of each process pool that is created"""
 
-def test_json_loader_list_files(
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pool_contexts.append(kwargs.get("mp_context"))
+
+    monkeypatch.setattr(
+        data_loader, "ProcessPoolExecutor", RecordingProcessPoolExecutor
+    )
+
+    parallel_pages = MarkdownLoader(settings_dict).load_pages()
+
+    assert len(pool_contexts) == 1
+    # Worker processes must not be forked from a build that is running other threads
+    assert pool_contexts[0].get_start_method() != "fork"
+    assert parallel_pages == serial_pages
+
+
+def test_json_loader(
     settings_dict,
 ):  # pylint: disable=redefined-outer-name
-    """Test the list_files method of the JSONLoader class."""
+    """Test the list_files and load_args methods of the JSONLoader class."""
     loader = JSONLoader(settings_dict)
     files = loader.list_files()
     json_path, json_file_name = files[0]
@@ -53,14 +155,7 @@ def test_json_loader_list_files(
     assert "src/store/" in json_path
     assert json_file_name.endswith(".json")
 
-
-def test_json_loader_load_args(
-    settings_dict,
-):  # pylint: disable=redefined-outer-name
-    """Test the load_args method of the JSONLoader class."""
-    loader = JSONLoader(settings_dict)
-    args = loader.load_args()
-    assert isinstance(args, dict)
+    assert isinstance(loader.load_args(), dict)
 
 
 def test_settings_loader_data(
@@ -68,33 +163,28 @@ def test_settings_loader_data(
     settings_dict,
 ):  # pylint: disable=redefined-outer-name
     """Test the data attribute of the SettingsLoader class."""
-    temp_abs_path = os.path.abspath(temp_project_path)
-    loader = SettingsLoader(temp_abs_path)
+    loader = SettingsLoader(str(temp_project_path))
     data = loader.data
 
     assert isinstance(data, dict)
-    assert os.path.abspath(data["build_dir"]) == os.path.abspath(
-        settings_dict["build_dir"]
-    )
+    assert data["build_dir"] == settings_dict["build_dir"]
     assert data["markdown_path"] == settings_dict["markdown_path"]
     assert data["json_config_path"] == settings_dict["json_config_path"]
     assert data["favicon_path"] == settings_dict["favicon_path"]
     assert data["scripts_path"] == settings_dict["scripts_path"]
     assert data["images_path"] == settings_dict["images_path"]
     assert data["styles_path"] == settings_dict["styles_path"]
-    assert set(data["template_paths"]) == set(settings_dict["template_paths"])
+    assert sorted(data["template_paths"]) == sorted(settings_dict["template_paths"])
 
 
 def test_settings_loader_load_args(
     temp_project_path,
 ):  # pylint: disable=redefined-outer-name
     """Test the load_args method of the SettingsLoader class."""
-    temp_abs_path = os.path.abspath(temp_project_path)
-    loader = SettingsLoader(temp_abs_path)
+    loader = SettingsLoader(str(temp_project_path))
     args = loader.load_args()
-    settings_path = os.path.join(temp_project_path, "build_settings.json")
-    with open(settings_path, "r", encoding="utf-8") as settings_file:
-        test_settings = json.load(settings_file)
+    settings_path = temp_project_path / "build_settings.json"
+    test_settings = json.loads(settings_path.read_bytes())
 
     assert isinstance(args, dict)
     assert args["build_dir"] == test_settings["build_dir"]
@@ -104,3 +194,64 @@ def test_settings_loader_load_args(
     assert args["scripts_path"] == test_settings["scripts_path"]
     assert args["images_path"] == test_settings["images_path"]
     assert args["styles_path"] == test_settings["styles_path"]
+
+
+def test_settings_loader_caches_template_paths(
+    temp_project_path,
+    settings_dict,
+):  # pylint: disable=redefined-outer-name
+    """Test that template paths are cached and refreshed when the tree changes."""
+    temp_abs_path = str(temp_project_path)
+    root_template_paths = [f"{temp_abs_path}/src/theme/views"]
+    template_paths = SettingsLoader(temp_abs_path).get_all_template_paths(
+        root_template_paths
+    )
+
+    assert sorted(template_paths) == sorted(settings_dict["template_paths"])
+    assert os.path.isfile(
+        os.path.join(temp_abs_path, ".shodo_cache", "template_paths.json")
+    )
+    assert (
+        SettingsLoader(temp_abs_path).get_all_template_paths(root_template_paths)
+        == template_paths
+    )
+
+    new_dir = os.path.join(temp_abs_path, "src/theme/views/pages/nested-route/new/")
+    os.makedirs(new_dir)
+    refreshed_paths = SettingsLoader(temp_abs_path).get_all_template_paths(
+        root_template_paths
+    )
+
+    assert sorted(refreshed_paths) == sorted([*template_paths, new_dir])
+
+
+def test_markdown_loader_load_all(
+    settings_dict,
+):  # pylint: disable=redefined-outer-name
+    """Test that load_all matches the results of load_args and list_pages."""
+    loader = MarkdownLoader(settings_dict)
+    args, pages = loader.load_all()
+
+    assert args == loader.load_args()
+    assert all("html" not in page for page in pages)
+
+    page_key = itemgetter("url_segment", "name")
+    assert sorted(loader.convert_pages(pages), key=page_key) == sorted(
+        loader.load_pages(), key=page_key
+    )
+
+
+def test_loaders_stamp_loaded_files(
+    settings_dict,
+):  # pylint: disable=redefined-outer-name
+    """Test that the loaders stamp every file that their render args are loaded from."""
+    markdown_loader = MarkdownLoader(settings_dict)
+    markdown_loader.load_all()
+    json_loader = JSONLoader(settings_dict)
+    json_loader.load_args()
+
+    for loader in (markdown_loader, json_loader):
+        assert sorted(stamp[0] for stamp in loader.file_stamps) == sorted(
+            os.path.join(dir_path, file_name)
+            for dir_path, file_name in loader.list_files()
+        )
@@ -2,10 +2,13 @@
 
 import os
 import shutil
+import pytest
+from shodo_ssg.assembler import initialize_components
 from shodo_ssg.static_site_generator import StaticSiteGenerator
 from tests.build_validation import (
     css_exist_in_build_dir,
     favicon_exists_in_build_dir,
+    get_build_index,
     images_exist_in_build_dir,
     linked_template_pages_exist_in_build_dir,
     markdown_pages_exist_in_build_dir,
@@ -118,6 +121,12 @@ def test_static_site_generator_refresh_and_create_new_build_dir(
     assert os.path.exists(build_path)
     assert not os.listdir(build_path)
     assert os.path.isdir(build_path)
+    static_site_generator.wait_for_build_dir_cleanup()
+    assert not [
+        path
+        for path in os.listdir(os.path.dirname(build_path))
+        if path.startswith(os.path.basename(build_path) + ".old.")
+    ]
 
 
 def test_static_site_generator_build(
@@ -135,16 +144,115 @@ def test_static_site_generator_build(
         f.write("test")
     assert os.path.exists(test_file)
     static_site_generator.build()
+    static_site_generator.wait_for_build_dir_cleanup()
     assert os.path.exists(build_path)
+    assert not os.path.exists(build_path + ".new")
     assert os.listdir(build_path)
     assert os.path.isdir(build_path)
     assert not os.path.exists(test_file)
     assert os.path.exists(os.path.join(build_path, "index.html"))
+    build_index = get_build_index(build_path)
     assert linked_template_pages_exist_in_build_dir(
-        build_path, settings_dict["template_paths"]
+        build_path, settings_dict["template_paths"], build_index
     )
-    assert markdown_pages_exist_in_build_dir(build_path, template_handler.md_pages)
-    assert scripts_exist_in_build_dir(build_path)
-    assert css_exist_in_build_dir(build_path)
-    assert images_exist_in_build_dir(build_path)
-    assert favicon_exists_in_build_dir(build_path)
+    assert markdown_pages_exist_in_build_dir(
+        build_path, template_handler.md_pages, build_index
+    )
+    assert scripts_exist_in_build_dir(build_path, build_index=build_index)
+    assert css_exist_in_build_dir(build_path, build_index=build_index)
+    assert images_exist_in_build_dir(build_path, build_index=build_index)
+    assert favicon_exists_in_build_dir(build_path, build_index=build_index)
+
+
+def test_static_site_generator_build_removes_previous_build_dir(
+    static_site_generator_deps,
+):  # pylint: disable=redefined-outer-name
+    """Test that the previous build directory is fully removed once a build completes."""
+    template_handler, asset_handler = static_site_generator_deps
+    static_site_generator = StaticSiteGenerator(template_handler, asset_handler)
+    build_path = static_site_generator.get_build_dir_path()
+    build_parent_dir = os.path.dirname(build_path)
+    build_dir_name = os.path.basename(build_path)
+    os.makedirs(build_path, exist_ok=True)
+    static_site_generator.build()
+    static_site_generator.wait_for_build_dir_cleanup()
+    assert os.path.isdir(build_path)
+    assert template_handler.build_dir == static_site_generator.build_dir
+    assert asset_handler.scripts.destination_path.startswith(
+        static_site_generator.build_dir + "/"
+    )
+    assert not [
+        path
+        for path in os.listdir(build_parent_dir)
+        if path.startswith(build_dir_name + ".old.")
+    ]
+
+
+def test_static_site_generator_build_relative_build_dir(
+    settings_dict, tmp_path, monkeypatch
+):  # pylint: disable=redefined-outer-name
+    """Test that a relative build directory is built under the project root."""
+    monkeypatch.chdir(tmp_path)
+    template_handler, asset_handler = initialize_components(
+        {**settings_dict, "build_dir": "dist"}
+    )
+    static_site_generator = StaticSiteGenerator(template_handler, asset_handler)
+    static_site_generator.build()
+    static_site_generator.wait_for_build_dir_cleanup()
+    build_path = os.path.join(settings_dict["root_path"], "dist")
+    build_index = get_build_index(build_path)
+    assert "index.html" in build_index
+    assert scripts_exist_in_build_dir(build_path, build_index=build_index)
+    assert not os.path.exists(tmp_path / "dist.new")
+    assert template_handler.build_dir == "dist"
+
+
+def test_static_site_generator_build_after_failed_build(
+    static_site_generator_deps, monkeypatch
+):  # pylint: disable=redefined-outer-name
+    """Test that pages edited before a failed build are rendered by the next build."""
+    template_handler, asset_handler = static_site_generator_deps
+    static_site_generator = StaticSiteGenerator(template_handler, asset_handler)
+    static_site_generator.build()
+
+    edited_page = template_handler.md_pages[0]
+    with open(edited_page["path"], "r", encoding="utf-8") as md_file:
+        md_text = md_file.read()
+    # Replace the file rather than writing to the one shared with other tests
+    os.unlink(edited_page["path"])
+    with open(edited_page["path"], "w", encoding="utf-8") as md_file:
+        md_file.write(md_text + "\nAn edited paragraph\n")
+
+    def fail_to_write():
+        raise OSError("Unable to copy images")
+
+    monkeypatch.setattr(asset_handler.images, "write", fail_to_write)
+    with pytest.raises(OSError):
+        static_site_generator.build()
+    monkeypatch.undo()
+
+    static_site_generator.build()
+    static_site_generator.wait_for_build_dir_cleanup()
+    page_path = os.path.join(
+        static_site_generator.get_build_dir_path(),
+        edited_page["url_segment"].strip("/"),
+        edited_page["name"],
+        "index.html",
+    )
+    with open(page_path, "r", encoding="utf-8") as page_file:
+        assert "An edited paragraph" in page_file.read()
+
+
+def test_static_site_generator_build_removes_leftover_build_dirs(
+    static_site_generator_deps,
+):  # pylint: disable=redefined-outer-name
+    """Test that build directories left behind by an interrupted removal are removed."""
+    template_handler, asset_handler = static_site_generator_deps
+    static_site_generator = StaticSiteGenerator(template_handler, asset_handler)
+    build_path = static_site_generator.get_build_dir_path()
+    leftover_build_dir = build_path + ".old.leftover"
+    os.makedirs(os.path.join(leftover_build_dir, "blog"))
+    static_site_generator.build()
+    static_site_generator.wait_for_build_dir_cleanup()
+    assert os.path.isdir(build_path)
+    assert not os.path.exists(leftover_build_dir)
@@ -1,7 +1,8 @@
 """Tests for the template_handler module."""
 
 import os
-from shodo_ssg.template_handler import TemplateHandler
+from jinja2 import Environment, FileSystemLoader
+from shodo_ssg.template_handler import PrebuiltFileSystemLoader, TemplateHandler
 from tests.build_validation import get_linked_page_relative_build_paths
 
 
@@ -17,6 +18,21 @@ def test_template_handler_init(
     assert template_handler.root_path
     assert template_handler.markdown_loader
     assert template_handler.json_loader
+    assert not template_handler.template_env.auto_reload
+    assert template_handler.template_env.bytecode_cache
+    assert os.path.isdir(os.path.join(settings["root_path"], ".shodo_cache/jinja"))
+
+
+def test_template_handler_init_dev_mode(
+    template_handler_dependencies,
+):  # pylint: disable=redefined-outer-name
+    """Test that dev mode enables auto reloading of templates."""
+    settings, markdown_loader, json_loader = template_handler_dependencies
+    template_handler = TemplateHandler(
+        settings, markdown_loader, json_loader, dev_mode=True
+    )
+
+    assert template_handler.template_env.auto_reload
 
 
 def test_template_handler_render_args(
@@ -173,6 +189,7 @@ def test_template_handler_write_article_pages(
         assert page_contents
         assert "<!DOCTYPE html>" in page_contents
         assert md_page["html"] in page_contents
+    assert "article" not in template_handler.render_args
 
 
 def test_template_handler_get_md_layout_template_defaults_to_root_layout(
@@ -268,3 +285,132 @@ def test_template_handler_write(
         assert page_contents
         assert "<!DOCTYPE html>" in page_contents
         assert md_page["html"] in page_contents
+
+
+def test_template_handler_get_md_layout_template_returns_closest_parent_layout(
+    template_handler_dependencies,
+):  # pylint: disable=redefined-outer-name
+    """Test that get_md_layout_template walks up the tree to the closest layout."""
+    settings, markdown_loader, json_loader = template_handler_dependencies
+    template_handler = TemplateHandler(settings, markdown_loader, json_loader)
+
+    url_segment = "/blog/subject/undefined/nested/"
+    layout = "articles/blog/subject/layout.jinja"
+
+    assert template_handler.get_md_layout_template(url_segment) == layout
+
+
+def test_template_handler_article_layouts(
+    template_handler_dependencies,
+):  # pylint: disable=redefined-outer-name
+    """Test the article_layouts property of the TemplateHandler class."""
+    settings, markdown_loader, json_loader = template_handler_dependencies
+    template_handler = TemplateHandler(settings, markdown_loader, json_loader)
+
+    assert template_handler.article_layouts == {
+        "articles/layout.jinja",
+        "articles/blog/subject/layout.jinja",
+        "articles/newsletter/layout.jinja",
+    }
+
+
+def test_template_handler_write_reuses_unchanged_article_pages(
+    template_handler_dependencies,
+):  # pylint: disable=redefined-outer-name
+    """Test that unchanged article pages are reused from the previous build."""
+    settings, markdown_loader, json_loader = template_handler_dependencies
+    previous_build_dir = settings["build_dir"]
+    os.makedirs(previous_build_dir, exist_ok=True)
+    previous_template_handler = TemplateHandler(settings, markdown_loader, json_loader)
+    previous_template_handler.save_build_manifest(previous_template_handler.write())
+
+    build_dir = previous_build_dir + ".new"
+    template_handler = TemplateHandler(
+        {**settings, "build_dir": build_dir}, markdown_loader, json_loader
+    )
+    template_handler.save_build_manifest(
+        template_handler.write(previous_build_dir=previous_build_dir)
+    )
+
+    md_pages = template_handler.md_pages
+    for md_page in md_pages:
+        page_path = os.path.join(
+            md_page["url_segment"].strip("/"), md_page["name"], "index.html"
+        )
+        assert os.path.samefile(
+            os.path.join(previous_build_dir, page_path),
+            os.path.join(build_dir, page_path),
+        )
+    assert not os.path.samefile(
+        os.path.join(previous_build_dir, "index.html"),
+        os.path.join(build_dir, "index.html"),
+    )
+
+    # An edited article is rendered again
+    edited_page = md_pages[0]
+    with open(edited_page["path"], "r", encoding="utf-8") as md_file:
+        md_text = md_file.read()
+    # Replace the file rather than writing to the one shared with other tests
+    os.unlink(edited_page["path"])
+    with open(edited_page["path"], "w", encoding="utf-8") as md_file:
+        md_file.write(md_text + "\nAn edited paragraph\n")
+    next_build_dir = previous_build_dir + ".next"
+    TemplateHandler(
+        {**settings, "build_dir": next_build_dir}, markdown_loader, json_loader
+    ).write(previous_build_dir=build_dir)
+    page_path = os.path.join(
+        edited_page["url_segment"].strip("/"), edited_page["name"], "index.html"
+    )
+    with open(
+        os.path.join(next_build_dir, page_path), "r", encoding="utf-8"
+    ) as page_file:
+        assert "An edited paragraph" in page_file.read()
+
+
+def test_template_handler_write_renders_articles_again_when_render_args_change(
+    template_handler_dependencies,
+):  # pylint: disable=redefined-outer-name
+    """Test that article pages are rendered again when a render argument changes."""
+    settings, markdown_loader, json_loader = template_handler_dependencies
+    previous_build_dir = settings["build_dir"]
+    os.makedirs(previous_build_dir, exist_ok=True)
+    previous_template_handler = TemplateHandler(settings, markdown_loader, json_loader)
+    previous_template_handler.save_build_manifest(previous_template_handler.write())
+
+    build_dir = previous_build_dir + ".new"
+    template_handler = TemplateHandler(
+        {**settings, "build_dir": build_dir}, markdown_loader, json_loader
+    )
+    template_handler.update_render_arg("metadata", {"title": "An updated title"})
+    template_handler.write(previous_build_dir=previous_build_dir)
+
+    md_page = template_handler.md_pages[0]
+    page_path = os.path.join(
+        md_page["url_segment"].strip("/"), md_page["name"], "index.html"
+    )
+    assert not os.path.samefile(
+        os.path.join(previous_build_dir, page_path),
+        os.path.join(build_dir, page_path),
+    )
+    with open(os.path.join(build_dir, page_path), "r", encoding="utf-8") as page_file:
+        assert "<title>An updated title</title>" in page_file.read()
+
+
+def test_prebuilt_file_system_loader_matches_file_system_loader(
+    settings_dict,
+):  # pylint: disable=redefined-outer-name
+    """Test that the prebuilt loader resolves templates to the same files as Jinja."""
+    environment = Environment()
+    loader = PrebuiltFileSystemLoader(settings_dict["template_paths"])
+    file_system_loader = FileSystemLoader(settings_dict["template_paths"])
+
+    template_names = file_system_loader.list_templates()
+    assert template_names
+    for template_name in template_names:
+        source, filename, uptodate = loader.get_source(environment, template_name)
+        expected_source, expected_filename, _ = file_system_loader.get_source(
+            environment, template_name
+        )
+        assert source == expected_source
+        assert filename == expected_filename
+        assert uptodate()